@@ -8,21 +8,26 @@ def download_gguf_model(url: str, path: str, progress_callback=None):
         return "✅ Model already exists."
 
     os.makedirs(os.path.dirname(path), exist_ok=True)
-    response = requests.get(url, stream=True)
 
-    if response.status_code != 200:
-        return f"❌ Failed to download model. Status code: {response.status_code}"
-
-    total_size = int(response.headers.get('content-length', 0))
-    block_size = 8192# 2024
-    downloaded_size = 0
-
-    with open(path, 'wb') as file:
-        for data in response.iter_content(block_size):
-            file.write(data)
-            downloaded_size += len(data)
-            if progress_callback:
-                progress_callback(min(downloaded_size / total_size, 1.0))
+    with requests.get(url, stream=True) as response:
+        if response.status_code != 200:
+            return f"❌ Failed to download model. Status code: {response.status_code}"
+
+        total_size = int(response.headers.get('content-length', 0))
+        block_size = 1 << 20  # 1 MiB
+        downloaded_size = 0
+        last_pct = -1
+
+        with open(path, 'wb') as file:
+            for data in response.iter_content(block_size):
+                file.write(data)
+                downloaded_size += len(data)
+                if progress_callback and total_size:
+                    # Report at most once per percent to avoid UI thrash
+                    pct = min(downloaded_size * 100 // total_size, 100)
+                    if pct != last_pct:
+                        last_pct = pct
+                        progress_callback(pct / 100)
 
     return f"✅ Download complete: {os.path.basename(path)}"
 
@@ -1,30 +1,51 @@
 # models/llm_loader.py
 
 import os
-import torch
-from transformers import pipeline
-from langchain_community.llms import OpenAI, HuggingFacePipeline, CTransformers
 from ai_agent.config import Settings
 from models.download_gguf_model import download_gguf_model
-from ctransformers import AutoModelForCausalLM  # if needed elsewhere
 
-def detect_gpu_layers():
-    """Basic GPU availability logic for quantized models."""
-    if torch.cuda.is_available():
-        return 50  # example default for 7B model
-    return 0  # fallback to CPU-only
+# Approximate VRAM per offloaded layer for Q4 GGUF models
+LAYER_BYTES_BY_MODEL_TYPE = {
+    "llama": 180 * 1024**2,
+    "mistral": 200 * 1024**2,
+    "mixtral": 350 * 1024**2,
+}
+
+def detect_gpu_layers(model_type: str = None):
+    """Size GPU offload for quantized models to the free VRAM."""
+    import torch
+
+    if not torch.cuda.is_available():
+        return 0  # fallback to CPU-only
+
+    model_type = model_type or Settings.gguf_model_type
+    per_layer_bytes = LAYER_BYTES_BY_MODEL_TYPE.get(model_type, LAYER_BYTES_BY_MODEL_TYPE["mistral"])
+    try:
+        free, _ = torch.cuda.mem_get_info(0)
+        layers = int(free * 0.85 / per_layer_bytes)
+    except Exception:
+        layers = max(int(os.environ.get("LLM_GPU_LAYERS", 0)), 0)
+
+    print(f"ℹ️ Offloading {layers} layers to GPU.")
+    return layers
 
 def load_llm(model_path: str = None, backend: str = None):
     try:
         backend = backend or Settings.llm_backend
 
+        # Heavy ML deps are imported per backend to keep startup light
         if backend == "openai":
+            from langchain_community.llms import OpenAI
+
             return OpenAI(
                 model_name=Settings.openai_model,
                 temperature=0.3
             )
 
         elif backend == "huggingface":
+            from transformers import pipeline
+            from langchain_community.llms import HuggingFacePipeline
+
             pipe = pipeline(
                 "text-generation",
                 model=Settings.hf_model_name,
@@ -35,17 +56,27 @@ def load_llm(model_path: str = None, backend: str = None):
             return HuggingFacePipeline(pipeline=pipe)
 
         elif backend == "ctransformers":
+            from langchain_community.llms import CTransformers
+
             model_path = model_path or Settings.gguf_model_path
             if not os.path.exists(model_path):
                 print(f"⚠️ Model not found at {model_path}. Attempting auto-download...")
                 model_path = download_gguf_model()
 
+            if not any(q in os.path.basename(model_path) for q in ("Q4_K_M", "Q5_K_M")):
+                print(f"⚠️ {os.path.basename(model_path)} is not a Q4_K_M/Q5_K_M quantization; inference may be slow.")
+
             return CTransformers(
                 model=model_path,
                 model_type=Settings.gguf_model_type,
                 config={
                     'max_new_tokens': 256,
                     'temperature': 0.3,
+                    'context_length': 4096,
+                    'batch_size': 512,
+                    'threads': os.cpu_count(),
+                    'mmap': True,
+                    'mlock': False,
                     'gpu_layers': detect_gpu_layers()
                 }
             )